@@ -1,20 +1,52 @@
 # FastAPI backend for Dev Guide Analyzer
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Literal, Dict, Any
-from datetime import datetime, timezone
+from typing import List, Literal, Dict, Any, Tuple
 import re
+import bisect
+from array import array
+from collections import OrderedDict
+from functools import cached_property
+from itertools import accumulate, islice
+import operator
 import hashlib
+import threading
+import time
 import ast
 import os
-import requests
+import logging
+import asyncio
+from contextlib import asynccontextmanager
+import httpx
+import orjson
 from dotenv import load_dotenv
 
 # Load .env if present
 load_dotenv()
 
-app = FastAPI(title="Dev Guide Analyzer API")
+logger = logging.getLogger("analyzer")
+
+# Shared client for the external AI providers: keeps connections (and TLS sessions) alive between fixes.
+# httpx drops idle connections after 5s by default, shorter than the usual gap between two fixes.
+_http = httpx.AsyncClient(
+	http2=True,
+	limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+	timeout=15,
+)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+	yield
+	await _http.aclose()
+
+
+# orjson renders the responses (which echo the submitted code) much faster than the stdlib encoder
+app = FastAPI(title="Dev Guide Analyzer API", lifespan=_lifespan, default_response_class=ORJSONResponse)
 
 # Allow Vite dev server origins
 app.add_middleware(
@@ -28,7 +60,11 @@ app.add_middleware(
 	allow_credentials=True,
 	allow_methods=["*"],
 	allow_headers=["*"],
+	# Report downloads carry their filename in this header
+	expose_headers=["Content-Disposition"],
 )
+# Reports (repeated markup, CSS, whitespace) and large analyze payloads compress well
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 Severity = Literal["Critical", "Major", "Minor"]
 
@@ -90,106 +126,263 @@ def status() -> dict:
     }
 
 # --- Heuristic analysis helpers ---
-_js_loop_regex = re.compile(r"for\s*\(.*;.*;.*\)")
+# Head of a C-style for(...;...;...) loop (see _has_c_style_for_loop)
+_js_loop_head_regex = re.compile(r"for\s*\(")
 _py_loop_regex = re.compile(r"^\s*for\s+.*:\s*$")
 _var_regex = re.compile(r"\bvar\b")
 _camel_violation_regex = re.compile(r"\b[a-z]+_[a-z0-9]+\b")
 _todo_comment_regex = re.compile(r"//\s*TODO|#\s*TODO", re.IGNORECASE)
+# The regexes above can't use sre's literal-prefix search; callers gate them on a plain
+# substring test (memchr-style fastsearch) that every match must contain
+
+
+# Line boundaries exactly as recognised by str.splitlines()
+_line_break_chars = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# Per-line style rules: (group, pattern, substrings that exempt the line, type, severity, message, suggestion)
+_StyleRule = Tuple[str, str, Tuple[str, ...], str, Severity, str, str]
+_style_rules: Dict[str, List[_StyleRule]] = {
+	"javascript": [
+		("eqeq", r"==", ("===", "!="), "Suggestion", "Minor", "Use strict equality (===)", "Replace == with ==="),
+		("var", r"\bvar\b", (), "Suggestion", "Minor", "Avoid var", "Use let or const"),
+	],
+	"python": [
+		("semicolon", rf";[^\S{_line_break_chars}]*(?=[{_line_break_chars}]|\Z)", (), "Suggestion", "Minor", "Unnecessary semicolon", "Remove trailing ; in Python"),
+		("print", r"print\(", (), "Warning", "Minor", "print used for logging", "Use the logging module for production"),
+	],
+	"java": [
+		("eqeq", r"==", ("equals(", "!="), "Suggestion", "Minor", "Use .equals() for string comparison", "Replace == with .equals() for strings"),
+	],
+	"cpp": [
+		("eqeq", r"==", ("!=", "std::"), "Suggestion", "Minor", "Consider using std::equal for complex comparisons", "Use std::equal for complex types"),
+	],
+}
+_style_rules["typescript"] = _style_rules["javascript"]
+# One alternation per language so each buffer is scanned once, dispatching on lastgroup
+_style_patterns = {
+	lang: re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, *_ in rules))
+	for lang, rules in _style_rules.items()
+}
+
+
+class CodeView:
+	"""Source text plus its line offsets, built once per request and shared by the analyzers."""
+
+	def __init__(self, text: str):
+		self.text = text
+
+	@cached_property
+	def digest(self) -> str:
+		return hashlib.sha256(self.text.encode("utf-8", "surrogatepass")).hexdigest()
+
+	@cached_property
+	def _offsets(self) -> Tuple["array[int]", "array[int]"]:
+		# Start offset of every line, and the offset where its content ends, built at C level
+		# from splitlines(); only the style-rule hits need them (via line_of / line)
+		text = self.text
+		starts = array("q", accumulate(map(len, text.splitlines(True)), initial=0))
+		ends = array("q", map(operator.add, starts, map(len, self.lines)))
+		if ends and ends[-1] == len(text):
+			# No trailing line break: the final accumulated offset isn't the start of another line
+			starts.pop()
+		else:
+			# A trailing line break (or empty text) leaves an empty last line ending at len(text)
+			ends.append(len(text))
+		return starts, ends
+
+	@property
+	def line_starts(self) -> "array[int]":
+		return self._offsets[0]
+
+	@property
+	def line_ends(self) -> "array[int]":
+		return self._offsets[1]
+
+	@property
+	def line_count(self) -> int:
+		return len(self.lines)
+
+	@cached_property
+	def lines(self) -> List[str]:
+		return self.text.splitlines()
+
+	def line_of(self, pos: int) -> int:
+		"""1-based line number of the character at ``pos``."""
+		return bisect.bisect_right(self.line_starts, pos)
+
+	def line(self, number: int) -> str:
+		return self.text[self.line_starts[number - 1]:self.line_ends[number - 1]]
+
+
+class _LRUCache:
+	"""Small thread-safe LRU map (sync endpoints run in FastAPI's threadpool)."""
+
+	def __init__(self, maxsize: int):
+		self.maxsize = maxsize
+		self._data: "OrderedDict[Any, Any]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: Any) -> Any:
+		with self._lock:
+			value = self._data.get(key)
+			if value is not None:
+				self._data.move_to_end(key)
+			return value
+
+	def put(self, key: Any, value: Any) -> None:
+		with self._lock:
+			self._data[key] = value
+			self._data.move_to_end(key)
+			if len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+
+
+# Keyed by (sha256 of the code, language) so cached entries don't pin the submitted code.
+# Cached values are shared between requests and must not be mutated.
+_analysis_cache = _LRUCache(512)
+_report_cache = _LRUCache(512)
+_html_report_cache = _LRUCache(512)
+# Detected language by blake2b digest of the stripped code
+_language_cache = _LRUCache(2048)
+# Bigger submissions are analyzed without caching: they rarely repeat and hashing them isn't free
+_MAX_CACHED_CODE_LEN = 200_000
+
+
+def _cache_key(view: CodeView, language: str) -> Tuple[str, str] | None:
+	if len(view.text) >= _MAX_CACHED_CODE_LEN:
+		return None
+	return (view.digest, language)
+
+# (whole second, its ISO string); replaced as one tuple so threadpool readers never see a torn pair
+_timestamp_cache: Tuple[int, str] = (-1, "")
+
+
+def _now_iso() -> str:
+	"""UTC timestamp for responses, formatted at most once per second."""
+	global _timestamp_cache
+	second = int(time.time())
+	cached = _timestamp_cache
+	if cached[0] != second:
+		cached = (second, time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(second)))
+		_timestamp_cache = cached
+	return cached[1]
+
+
+_branch_keyword_regex = re.compile(r"\b(?:if|for|while|case|catch|elif|else\s+if)\b", re.IGNORECASE)
+
 
+def _has_c_style_for_loop(code: str) -> bool:
+	# Same answer as searching for r"for\s*\(.*;.*;.*\)", whose backtracking is cubic on a long
+	# line full of semicolons. Only the first head on a line is checked (';', ';', ')' in order
+	# before the line break); a later head on that line only sees a suffix of the same text, so it
+	# can't succeed where the first failed and is skipped. Every line is scanned once.
+	checked_to = -1
+	for m in _js_loop_head_regex.finditer(code):
+		start = m.end()
+		if start <= checked_to:
+			continue
+		eol = code.find("\n", start)
+		if eol == -1:
+			eol = len(code)
+		first = code.find(";", start, eol)
+		if first != -1:
+			second = code.find(";", first + 1, eol)
+			if second != -1 and code.find(")", second + 1, eol) != -1:
+				return True
+		checked_to = eol
+	return False
 
-def _estimate_cyclomatic_complexity(code: str) -> int:
-	keywords = [" if ", " for ", " while ", " case ", " catch ", " elif ", " else if "]
-	count = 1
-	low = f" {code.lower()} "
-	for k in keywords:
-		count += low.count(k)
+
+def _estimate_cyclomatic_complexity(view: CodeView) -> int:
+	# The estimate is capped at 30, so stop scanning after 29 branch keywords
+	count = 1 + sum(1 for _ in islice(_branch_keyword_regex.finditer(view.text), 29))
 	return max(1, min(count, 30))
 
 
-def _readability_score(code: str) -> int:
-	lines = [l for l in code.splitlines() if l.strip()]
-	avg_len = sum(len(l) for l in lines) / max(1, len(lines))
-	too_long = sum(1 for l in lines if len(l) > 120)
+def _readability_score(view: CodeView) -> int:
+	# map/filter over builtins keep the per-line work in C (no bytecode per line)
+	lens = list(map(len, filter(str.strip, view.lines)))
+	avg_len = sum(lens) / max(1, len(lens))
+	too_long = sum(map((120).__lt__, lens))
 	score = 100 - min(60, int(avg_len)) - min(20, too_long * 2)
 	return max(10, min(score, 100))
 
 
 def _style_adherence(code: str, language: str) -> int:
 	penalty = 0
-	if language.lower() in ("javascript", "typescript") and _var_regex.search(code):
+	if language.lower() in ("javascript", "typescript") and "var" in code and _var_regex.search(code):
 		penalty += 10
-	if _camel_violation_regex.search(code):
+	if "_" in code and _camel_violation_regex.search(code):
 		penalty += 10
-	if _todo_comment_regex.search(code):
+	if ("//" in code or "#" in code) and _todo_comment_regex.search(code):
 		penalty += 5
 	return max(10, 95 - penalty)
 
 
-def _detect_language(code: str, hint: str) -> str:
-	if hint and hint.lower() != "auto":
-		return hint
-	
-	text = code.strip()
-	if not text:
-		return "javascript"  # default
-	
-	low = text.lower()
-	
+# Language indicators in detection priority order: the first language with any
+# indicator present in the code wins.
+_language_indicators: List[Tuple[str, List[str]]] = [
 	# Python detection (highest priority)
-	python_indicators = [
+	("python", [
 		"def ", "import ", "from ", "print(", "if __name__", "lambda ", "yield ",
 		"try:", "except:", "finally:", "with ", "as ", "elif ", "else:", "class ",
 		"@", "__init__", "self.", "None", "True", "False"
-	]
-	if any(indicator in text for indicator in python_indicators):
-		return "python"
-	
-	# Java detection
-	java_indicators = [
+	]),
+	("java", [
 		"public class", "public static void main", "System.out.println",
 		"import java.", "private ", "protected ", "public ", "extends ", "implements ",
 		"@Override", "class ", "interface ", "package ", "throws ", "throw new"
-	]
-	if any(indicator in text for indicator in java_indicators):
-		return "java"
-	
-	# C++ detection
-	cpp_indicators = [
+	]),
+	("cpp", [
 		"#include <iostream>", "#include <vector>", "#include <string>", "using namespace std",
 		"std::", "cout <<", "cin >>", "::", "class ", "public:", "private:", "protected:",
 		"template<", "typename ", "nullptr", "auto ", "constexpr ", "override ", "final "
-	]
-	if any(indicator in text for indicator in cpp_indicators):
-		return "cpp"
-	
+	]),
 	# C language detection (specific indicators to avoid confusion with C++)
-	c_indicators = [
+	("c", [
 		"#include <stdio.h>", "#include <stdlib.h>", "#include <string.h>", "#include <math.h>",
 		"printf(", "scanf(", "malloc(", "calloc(", "free(", "struct ", "typedef ", "enum ",
 		"#define ", "#ifdef ", "#ifndef ", "#endif", "#pragma ", "->", "sizeof(", "strlen("
-	]
-	if any(indicator in text for indicator in c_indicators):
-		return "c"
-	
+	]),
 	# TypeScript detection (more specific than JS)
-	ts_indicators = [
+	("typescript", [
 		"interface ", "type ", "enum ", "as ", "public ", "private ", "protected ",
 		"readonly ", "abstract ", "implements ", "extends ", ": string", ": number",
 		": boolean", ": any", ": void", "Array<", "Promise<", "Map<", "Set<", "<>",
 		"@", "namespace ", "module ", "declare ", "keyof ", "typeof ", "is "
-	]
-	if any(indicator in text for indicator in ts_indicators):
-		return "typescript"
-	
+	]),
 	# JavaScript detection (fallback for JS-like code)
-	js_indicators = [
+	("javascript", [
 		"function ", "=>", "console.log", "const ", "let ", "var ", "return ",
 		"if (", "for (", "while (", "switch (", "case ", "break;", "continue;",
 		"document.", "window.", "setTimeout", "setInterval", "addEventListener",
 		"async ", "await ", "Promise", "async function", "new Promise"
-	]
-	if any(indicator in text for indicator in js_indicators):
-		return "javascript"
+	]),
+]
+def _detect_language(code: str, hint: str) -> str:
+	if hint and hint.lower() != "auto":
+		return hint
+	
+	text = code.strip()
+	if not text:
+		return "javascript"  # default
+	# Short snippets are cheaper to scan than to hash
+	if len(text) < 256 or len(text) >= _MAX_CACHED_CODE_LEN:
+		return _scan_language(text)
+	key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+	language = _language_cache.get(key)
+	if language is None:
+		language = _scan_language(text)
+		_language_cache.put(key, language)
+	return language
+
+
+def _scan_language(text: str) -> str:
+	# Ordered cascade of substring checks: each `in` is a C-level search, which beats one big
+	# regex alternation tried at every position for code that has no early Python hit.
+	for lang, indicators in _language_indicators:
+		if any(indicator in text for indicator in indicators):
+			return lang
 	
 	# Default fallback based on common patterns
 	if "{" in text and "}" in text:
@@ -202,48 +395,104 @@ def _detect_language(code: str, hint: str) -> str:
 	return "javascript"
 
 
+_non_bracket_regex = re.compile(r"[^()\[\]{}]+")
+_bracket_pairs = {')': '(', ']': '[', '}': '{'}
+_closing_brackets = {o: c for c, o in _bracket_pairs.items()}
+
+
 def _check_js_brackets(code: str) -> List[Issue]:
-	stack = []
-	pairs = {')':'(', ']':'[', '}':'{'}
-	openers = set(pairs.values())
 	issues: List[Issue] = []
-	for idx, ch in enumerate(code):
-		if ch in openers:
-			stack.append((ch, idx))
-		elif ch in pairs:
-			if not stack or stack[-1][0] != pairs[ch]:
-				issues.append(Issue(line=1, type="Error", severity="Critical", message="Unbalanced brackets/parens", suggestion="Fix bracket/parenthesis balancing"))
-				return issues
-			else:
-				stack.pop()
-	if stack:
+	# Only bracket characters matter: drop everything else in one C-level pass, and
+	# rule out unequal counts before walking the (much shorter) bracket string
+	brackets = _non_bracket_regex.sub("", code)
+	balanced = all(brackets.count(o) == brackets.count(c) for c, o in _bracket_pairs.items())
+	if balanced:
+		stack: List[str] = []
+		for ch in brackets:
+			if ch in "([{":
+				stack.append(ch)
+			elif not stack or stack.pop() != _bracket_pairs[ch]:
+				balanced = False
+				break
+	if not balanced:
 		issues.append(Issue(line=1, type="Error", severity="Critical", message="Unbalanced brackets/parens", suggestion="Fix bracket/parenthesis balancing"))
 	return issues
 
 
-def _find_issues(code: str, language: str) -> List[Issue]:
+# Line breaks as counted by the Python tokenizer (SyntaxError.lineno)
+_py_line_split_regex = re.compile(r"(\r\n|\r|\n)")
+_py_indent_regex = re.compile(r"[ \t]*")
+
+
+def _check_python_syntax(code: str) -> List[Issue]:
 	issues: List[Issue] = []
-	lines = code.splitlines()
+	try:
+		ast.parse(code)
+		return issues
+	except SyntaxError as e:
+		issues.append(Issue(line=int(getattr(e, 'lineno', 1) or 1), type="Error", severity="Critical", message=f"SyntaxError: {e.msg}", suggestion="Fix Python syntax"))
+
+	# Find further errors by neutralising the offending line and re-parsing the whole
+	# module (single lines can't be parsed on their own, e.g. anything indented)
+	parts = _py_line_split_regex.split(code)  # [line1, sep, line2, sep, ...]
+	line_no = issues[0].line
+	seen_lines = {line_no}
+	for _ in range(10):
+		idx = 2 * (line_no - 1)
+		if idx >= len(parts) or not parts[idx].strip():
+			break
+		indent = _py_indent_regex.match(parts[idx]).group()
+		# Keep a following indented block attached to something
+		following = next((p for p in parts[idx + 2::2] if p.strip()), "")
+		deeper = len(_py_indent_regex.match(following).group()) > len(indent)
+		parts[idx] = indent + ("if 1:" if deeper else "pass")
+		try:
+			ast.parse("".join(parts))
+			break
+		except SyntaxError as e:
+			line_no = int(getattr(e, 'lineno', 1) or 1)
+		if line_no in seen_lines:
+			break
+		seen_lines.add(line_no)
+	for i in sorted(seen_lines - {issues[0].line}):
+		issues.append(Issue(line=i, type="Error", severity="Critical", message="Potential syntax error", suggestion="Check line syntax"))
+	return issues
+
+
+def _keyword_regex(*keywords: str) -> "re.Pattern[str]":
+	# Plain substring semantics (like `kw in line`), but one scan instead of one per keyword
+	return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+# Missing-semicolon heuristics: block openers that exempt a line, and statements that need ';'
+_c_block_keyword_regex = _keyword_regex('if', 'for', 'while', 'switch', 'struct', 'enum', 'typedef')
+_c_statement_keyword_regex = _keyword_regex('int ', 'char ', 'float ', 'double ', 'return', 'break', 'continue')
+_cpp_block_keyword_regex = _keyword_regex('if', 'for', 'while', 'switch', 'class', 'struct', 'namespace')
+_cpp_statement_keyword_regex = _keyword_regex('int ', 'char ', 'float ', 'double ', 'bool ', 'string ', 'auto ', 'return')
+_java_block_keyword_regex = _keyword_regex('if', 'for', 'while', 'switch', 'class', 'interface', 'try', 'catch')
+_java_statement_keyword_regex = _keyword_regex('int ', 'String ', 'boolean ', 'double ', 'float ', 'char ', 'return', 'break', 'continue')
+_js_statement_keyword_regex = _keyword_regex('const ', 'let ', 'var ', 'return ', 'break', 'continue', 'throw')
+# Line endings that mean a statement is already terminated (or continues on the next line)
+_statement_endings = (';', '{', '}', ':', ',', ')', '(')
+_js_statement_endings = (';', '{', '}', ':', ',', ')')
+# JS/TS lines that never need a trailing semicolon
+_js_non_statement_prefixes = ('//', '/*', '*', 'function', 'if', 'for', 'while', 'switch', 'try', 'catch', 'else')
+
+
+def _find_issues(view: CodeView, language: str) -> List[Issue]:
+	issues: List[Issue] = []
+	code = view.text
 	lang = language.lower()
 
 	# Critical syntax checks (these are ERRORS that must be fixed)
 	if lang == "python":
-		try:
-			ast.parse(code)
-		except SyntaxError as e:
-			# Parse multiple syntax errors
-			issues.append(Issue(line=int(getattr(e, 'lineno', 1) or 1), type="Error", severity="Critical", message=f"SyntaxError: {e.msg}", suggestion="Fix Python syntax"))
-			# Try to find additional syntax errors by parsing line by line
-			for i, line in enumerate(lines, start=1):
-				try:
-					ast.parse(line) if line.strip() else None
-				except:
-					if line.strip() and not any(issue.line == i for issue in issues):
-						issues.append(Issue(line=i, type="Error", severity="Critical", message="Potential syntax error", suggestion="Check line syntax"))
+		issues.extend(_check_python_syntax(code))
 	elif lang in ("javascript", "typescript"):
 		issues.extend(_check_js_brackets(code))
-		# Enhanced JavaScript/TypeScript error detection
-		for i, line in enumerate(lines, start=1):
+		# Enhanced JavaScript/TypeScript error detection, one pass over the lines;
+		# semicolon errors are reported after the others as before
+		semicolon_issues: List[Issue] = []
+		for i, line in enumerate(view.lines, start=1):
 			line_stripped = line.strip()
 			if line_stripped:
 				# Check for undefined variables (basic detection)
@@ -252,19 +501,25 @@ def _find_issues(code: str, language: str) -> List[Issue]:
 				# Check for missing function definitions
 				if "function " in line_stripped and not line_stripped.endswith("{") and not "=>" in line_stripped:
 					issues.append(Issue(line=i, type="Error", severity="Critical", message="Function declaration syntax error", suggestion="Add opening brace or fix function syntax"))
+				# Check for missing semicolons (lines that are clearly statements)
+				if (not line_stripped.startswith(_js_non_statement_prefixes) and
+					not line_stripped.endswith(_js_statement_endings) and
+					_js_statement_keyword_regex.search(line_stripped)):
+					semicolon_issues.append(Issue(line=i, type="Error", severity="Critical", message="Missing semicolon", suggestion="Add semicolon at end of statement"))
+		issues.extend(semicolon_issues)
 	
 	# C language error detection
 	elif lang == "c":
 		# Check for common C syntax errors
-		for i, line in enumerate(lines, start=1):
+		for i, line in enumerate(view.lines, start=1):
 			line_stripped = line.strip()
 			if line_stripped:
 				# Check for missing semicolons (excluding preprocessor directives and function declarations)
 				if (not line_stripped.startswith('#') and 
-					not line_stripped.endswith((';', '{', '}', ':', ',', ')', '(')) and
-					not any(keyword in line_stripped for keyword in ['if', 'for', 'while', 'switch', 'struct', 'enum', 'typedef'])):
+					not line_stripped.endswith(_statement_endings) and
+					not _c_block_keyword_regex.search(line_stripped)):
 					# Check if it's a statement that should end with semicolon
-					if any(keyword in line_stripped for keyword in ['int ', 'char ', 'float ', 'double ', 'return', 'break', 'continue']):
+					if _c_statement_keyword_regex.search(line_stripped):
 						issues.append(Issue(line=i, type="Error", severity="Critical", message="Missing semicolon", suggestion="Add semicolon at end of statement"))
 
 				# Check for undefined functions/variables (basic detection)
@@ -274,13 +529,13 @@ def _find_issues(code: str, language: str) -> List[Issue]:
 	# C++ language error detection
 	elif lang == "cpp":
 		# Enhanced C++ error detection
-		for i, line in enumerate(lines, start=1):
+		for i, line in enumerate(view.lines, start=1):
 			line_stripped = line.strip()
 			if line_stripped and not line_stripped.startswith('#'):
 				# Check for missing semicolons
-				if (not line_stripped.endswith((';', '{', '}', ':', ',', ')', '(')) and
-					not any(keyword in line_stripped for keyword in ['if', 'for', 'while', 'switch', 'class', 'struct', 'namespace'])):
-					if any(keyword in line_stripped for keyword in ['int ', 'char ', 'float ', 'double ', 'bool ', 'string ', 'auto ', 'return']):
+				if (not line_stripped.endswith(_statement_endings) and
+					not _cpp_block_keyword_regex.search(line_stripped)):
+					if _cpp_statement_keyword_regex.search(line_stripped):
 						issues.append(Issue(line=i, type="Error", severity="Critical", message="Missing semicolon", suggestion="Add semicolon at end of statement"))
 				
 				# Check for undefined variables/functions
@@ -290,84 +545,84 @@ def _find_issues(code: str, language: str) -> List[Issue]:
 	# Java error detection
 	elif lang == "java":
 		# Enhanced Java error detection
-		for i, line in enumerate(lines, start=1):
+		for i, line in enumerate(view.lines, start=1):
 			line_stripped = line.strip()
 			if line_stripped:
 				# Check for missing semicolons
-				if (not line_stripped.endswith((';', '{', '}', ':', ',', ')', '(')) and
-					not any(keyword in line_stripped for keyword in ['if', 'for', 'while', 'switch', 'class', 'interface', 'try', 'catch'])):
-					if any(keyword in line_stripped for keyword in ['int ', 'String ', 'boolean ', 'double ', 'float ', 'char ', 'return', 'break', 'continue']):
+				if (not line_stripped.endswith(_statement_endings) and
+					not _java_block_keyword_regex.search(line_stripped)):
+					if _java_statement_keyword_regex.search(line_stripped):
 						issues.append(Issue(line=i, type="Error", severity="Critical", message="Missing semicolon", suggestion="Add semicolon at end of statement"))
 				
 				# Check for undefined variables/methods
 				if "undefined_method" in line_stripped or "undefined_variable" in line_stripped:
 					issues.append(Issue(line=i, type="Error", severity="Critical", message="Undefined method/variable", suggestion="Declare or import required definition"))
 	
-	# Check for missing semicolons in JS/TS (critical errors)
-	if lang in ("javascript", "typescript"):
-		for i, line in enumerate(lines, start=1):
-			line_stripped = line.strip()
-			if line_stripped and not line_stripped.startswith(('//', '/*', '*', 'function', 'if', 'for', 'while', 'switch', 'try', 'catch', 'else')):
-				# Check if line should end with semicolon
-				if not line_stripped.endswith((';', '{', '}', ':', ',', ')')):
-					# Skip lines that are clearly statements
-					if any(keyword in line_stripped for keyword in ['const ', 'let ', 'var ', 'return ', 'break', 'continue', 'throw']):
-						if not line_stripped.endswith(';'):
-							issues.append(Issue(line=i, type="Error", severity="Critical", message="Missing semicolon", suggestion="Add semicolon at end of statement"))
-
 	# Style/maintainability warnings & suggestions (do not count as errors)
+	rules = _style_rules.get(lang)
+	if rules:
+		skip = ("print",) if lang == "python" and "logging" in code else ()
+		hits: Dict[int, set] = {}
+		# One scan per buffer, only the lines with a hit are looked at afterwards
+		for m in _style_patterns[lang].finditer(code):
+			if m.lastgroup not in skip:
+				hits.setdefault(view.line_of(m.start()), set()).add(m.lastgroup)
+		for i in sorted(hits):
+			if len(issues) >= 100:
+				break
+			line = view.line(i)
+			for name, _, excluded, type_, severity, message, suggestion in rules:
+				if name in hits[i] and not any(x in line for x in excluded):
+					issues.append(Issue(line=i, type=type_, severity=severity, message=message, suggestion=suggestion))
+
 	if lang in ("javascript", "typescript"):
-		for i, line in enumerate(lines, start=1):
-			if "==" in line and "===" not in line and "!=" not in line:
-				issues.append(Issue(line=i, type="Suggestion", severity="Minor", message="Use strict equality (===)", suggestion="Replace == with ==="))
-			if _var_regex.search(line):
-				issues.append(Issue(line=i, type="Suggestion", severity="Minor", message="Avoid var", suggestion="Use let or const"))
-		if _js_loop_regex.search(code):
+		if _has_c_style_for_loop(code):
 			issues.append(Issue(line=1, type="Warning", severity="Major", message="Traditional for loop detected", suggestion="Consider array methods like map/filter/reduce"))
-
 	elif lang == "python":
-		for i, line in enumerate(lines, start=1):
-			if line.rstrip().endswith(";"):
-				issues.append(Issue(line=i, type="Suggestion", severity="Minor", message="Unnecessary semicolon", suggestion="Remove trailing ; in Python"))
-			if "print(" in line and "logging" not in code:
-				issues.append(Issue(line=i, type="Warning", severity="Minor", message="print used for logging", suggestion="Use the logging module for production"))
 		if _py_loop_regex.search(code) and "range(" in code:
 			issues.append(Issue(line=1, type="Warning", severity="Major", message="Manual index loop", suggestion="Prefer list comprehensions"))
 
-	elif lang == "java":
-		for i, line in enumerate(lines, start=1):
-			if "==" in line and "equals(" not in line and "!=" not in line:
-				issues.append(Issue(line=i, type="Suggestion", severity="Minor", message="Use .equals() for string comparison", suggestion="Replace == with .equals() for strings"))
-	
-	elif lang == "cpp":
-		for i, line in enumerate(lines, start=1):
-			if "==" in line and "!=" not in line and "std::" not in line:
-				issues.append(Issue(line=i, type="Suggestion", severity="Minor", message="Consider using std::equal for complex comparisons", suggestion="Use std::equal for complex types"))
-
 	# Generic suggestions
-	if len(code) > 0 and len(code.splitlines()) > 200:
+	if view.line_count > 200:
 		issues.append(Issue(line=1, type="Warning", severity="Major", message="Very large file", suggestion="Consider splitting into smaller modules"))
 
 	# Generic naming suggestion
-	if _camel_violation_regex.search(code) and lang in ("javascript", "typescript"):
+	if lang in ("javascript", "typescript") and "_" in code and _camel_violation_regex.search(code):
 		issues.append(Issue(line=1, type="Suggestion", severity="Minor", message="snake_case found in JS/TS", suggestion="Use camelCase for variables"))
 
 	return issues[:100]
 
 
-def _analyze(language: str, code: str) -> Dict[str, Any]:
+def _split_errors(issues: List[Issue]) -> Tuple[List[Issue], List[Issue]]:
+	"""Partition issues into (errors, everything else) in one pass, keeping their order."""
+	errors: List[Issue] = []
+	others: List[Issue] = []
+	for it in issues:
+		if it.type == "Error":
+			errors.append(it)
+		else:
+			others.append(it)
+	return errors, others
+
+
+def _analyze(language: str, view: CodeView) -> Dict[str, Any]:
+	# Identical submissions (re-analyze, fix, report downloads) skip the work entirely
+	key = _cache_key(view, language)
+	cached = _analysis_cache.get(key) if key is not None else None
+	if cached is not None:
+		return cached
+
 	# Normal analysis
-	issues = _find_issues(code, language)
+	issues = _find_issues(view, language)
 	metrics = {
-		"cyclomaticComplexity": _estimate_cyclomatic_complexity(code),
-		"readabilityScore": _readability_score(code),
-		"styleAdherence": _style_adherence(code, language),
+		"cyclomaticComplexity": _estimate_cyclomatic_complexity(view),
+		"readabilityScore": _readability_score(view),
+		"styleAdherence": _style_adherence(view.text, language),
 	}
 	
-	# Count different types of issues
-	error_count = sum(1 for i in issues if i.type == "Error")
-	warning_count = sum(1 for i in issues if i.type == "Warning")
-	suggestion_count = sum(1 for i in issues if i.type == "Suggestion")
+	# Partitioned once here so the reports and the fixer don't have to re-filter
+	errors, others = _split_errors(issues)
+	error_count = len(errors)
 	
 	# Calculate score based on errors only
 	if error_count == 0:
@@ -379,13 +634,19 @@ def _analyze(language: str, code: str) -> Dict[str, Any]:
 		base_score = min(50, int(0.3 * metrics["readabilityScore"] + 0.2 * metrics["styleAdherence"]))
 		score = max(5, base_score - error_penalty)
 	
-	# Log for debugging
-	print(f"DEBUG: {language} - Errors: {error_count}, Warnings: {warning_count}, Suggestions: {suggestion_count}, Score: {score}")
+	# Log for debugging (the other counts are only needed when DEBUG is on)
+	if logger.isEnabledFor(logging.DEBUG):
+		warning_count = sum(1 for i in others if i.type == "Warning")
+		suggestion_count = sum(1 for i in others if i.type == "Suggestion")
+		logger.debug("%s - Errors: %d, Warnings: %d, Suggestions: %d, Score: %d", language, error_count, warning_count, suggestion_count, score)
 	
-	return {"issues": issues, "metrics": metrics, "score": score}
+	result = {"issues": issues, "errors": errors, "others": others, "metrics": metrics, "score": score}
+	if key is not None:
+		_analysis_cache.put(key, result)
+	return result
 
 
-def _call_openrouter_fix_with_errors(code: str, language: str, errors: List[Issue]) -> str | None:
+async def _call_openrouter_fix_with_errors(code: str, language: str, errors: List[Issue]) -> str | None:
 	api_key = os.environ.get("OPENROUTER_API_KEY")
 	if not api_key:
 		return None
@@ -399,9 +660,9 @@ def _call_openrouter_fix_with_errors(code: str, language: str, errors: List[Issu
 	body = {"model": model, "messages": messages, "temperature": 0.1, "max_tokens": 2000}
 	headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "HTTP-Referer": "http://localhost:8081", "X-Title": "Dev Guide Analyzer"}
 	try:
-		resp = requests.post(endpoint, json=body, headers=headers, timeout=15)  # Reduced timeout
+		resp = await _http.post(endpoint, content=orjson.dumps(body), headers=headers)
 		resp.raise_for_status()
-		data = resp.json()
+		data = orjson.loads(resp.content)
 		text = (data.get("choices") or [{}])[0].get("message", {}).get("content", "")
 		if not text:
 			return None
@@ -415,11 +676,11 @@ def _call_openrouter_fix_with_errors(code: str, language: str, errors: List[Issu
 				text = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
 		return text
 	except Exception as e:
-		print(f"OpenRouter API error: {e}")
+		logger.warning("OpenRouter API error: %s", e)
 		return None
 
 
-def _call_gemini_fix_with_errors(code: str, language: str, errors: List[Issue]) -> str | None:
+async def _call_gemini_fix_with_errors(code: str, language: str, errors: List[Issue]) -> str | None:
 	api_key = os.environ.get("GOOGLE_API_KEY")
 	if not api_key:
 		return None
@@ -440,9 +701,9 @@ def _call_gemini_fix_with_errors(code: str, language: str, errors: List[Issue])
 		}
 	}
 	try:
-		resp = requests.post(endpoint, json=body, timeout=15)  # Reduced timeout
+		resp = await _http.post(endpoint, content=orjson.dumps(body), headers={"Content-Type": "application/json"})
 		resp.raise_for_status()
-		data = resp.json()
+		data = orjson.loads(resp.content)
 		cand = (data.get("candidates") or [{}])[0]
 		parts = (((cand.get("content") or {}).get("parts")) or [])
 		text = "".join(p.get("text", "") for p in parts)
@@ -458,18 +719,97 @@ def _call_gemini_fix_with_errors(code: str, language: str, errors: List[Issue])
 				text = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
 		return text
 	except Exception as e:
-		print(f"Gemini API error: {e}")
+		logger.warning("Gemini API error: %s", e)
 		return None
 
 
-def _auto_fix(code: str, language: str) -> Dict[str, Any]:
-	attempts: List[Dict[str, Any]] = []
+# Semicolon insertion in _heuristic_fix: lines to leave alone, and statements that get a ';'
+_fix_statement_endings = (';', '{', '}', ':', ',')
+_java_fix_skip_prefixes = ('//', '/*', '*', 'public', 'private', 'protected', 'class', 'interface', 'enum')
+_java_fix_keyword_regex = _keyword_regex('return ', 'System.out', 'break', 'continue', 'throw')
+_cpp_fix_skip_prefixes = ('#', '//', '/*', '*', 'class', 'struct', 'namespace', 'public:', 'private:', 'protected:')
+_cpp_fix_keyword_regex = _keyword_regex('return ', 'cout', 'cin', 'break', 'continue', 'throw')
+_c_fix_skip_prefixes = ('#', '//', '/*', '*')
+_c_fix_keyword_regex = _keyword_regex('return ', 'break', 'continue', 'int ', 'char ', 'float ', 'double ')
+_py_definition_keyword_regex = _keyword_regex('def ', 'class ', 'if ', 'for ', 'while ')
+# Rewrites applied to user code. Identifiers are only ever matched from the start of a word, so the
+# \b anchor and possessive quantifier don't change what is replaced; they stop the engine from
+# retrying every position inside a long word, which was quadratic.
+_loose_equality_regex = re.compile(r"(?<![!<>=])==(?!=)")
+_java_string_equality_regex = re.compile(r'\b(\w++)\s*==\s*"([^"]*)"')
+# Keyword plus the whitespace after it; the rest of the colon rewrite is done by _add_missing_colons
+_py_colon_head_regex = re.compile(r"(?<!\s)\s++(?:if|for|while|def|class|elif|else|except|finally|with)(\s++)")
+_colon_or_newline_regex = re.compile(r"[:\n]")
+_whitespace_run_regex = re.compile(r"\s*+")
+
+
+def _add_missing_colons(code: str) -> Tuple[str, int]:
+	r"""Same result as ``re.subn(r'(\s+)(if|...|with)\s+([^:\n]+)(\s*)(?!\s*:)', r'\1\2 \3:', code)``.
+
+	That pattern lets the separator, the condition, the trailing whitespace and the lookahead all
+	split the same whitespace run, which backtracks cubically on e.g. " if" + " " * 1000 + ":".
+	Here each keyword head is resolved directly to the (condition, match end) the regex engine
+	would have settled on, with bounded scans, so the whole rewrite is linear.
+	"""
+	out: List[str] = []
+	done = 0
+	count = 0
+	pos = 0
+	n = len(code)
+	while True:
+		m = _py_colon_head_regex.search(code, pos)
+		if m is None:
+			break
+		sep_start, e = m.span(1)  # code[e] is the first non-space after the keyword
+		cond = None  # (start, end) of the text that gets the colon
+		end = 0
+		if e < n and code[e] != ":":
+			nxt = _colon_or_newline_regex.search(code, e + 1)
+			p = nxt.start() if nxt else n
+			if p == n:
+				cond, end = (e, n), n
+			elif code[p] == "\n":
+				# the trailing whitespace swallows the line break and the next line's indentation
+				q = _whitespace_run_regex.match(code, p).end()
+				if q == n or code[q] != ":":
+					cond, end = (e, p), q
+			if cond is None:
+				# cut the condition just before its last non-space character on the line
+				last = len(code[e + 1:p].rstrip())
+				if last:
+					cond = (e, e + last)
+					end = e + last
+		if cond is None and (e == n or code[e] != ":"):
+			# backtrack into the separator: the condition becomes a piece of whitespace
+			if code[e - 1] != "\n":
+				if e - 1 > sep_start:
+					cond, end = (e - 1, e), e
+			else:
+				s = len(code[sep_start + 1:e - 1].rstrip("\n"))
+				if s:
+					s += sep_start
+					cond, end = (s, code.index("\n", s)), e
+		if cond is None:
+			pos = sep_start
+			continue
+		out.append(code[done:m.start(1)])
+		out.append(" ")
+		out.append(code[cond[0]:cond[1]])
+		out.append(":")
+		done = pos = end
+		count += 1
+	if not count:
+		return code, 0
+	out.append(code[done:])
+	return "".join(out), count
+
+
+def _heuristic_fix(code: str, language: str) -> Dict[str, Any]:
 	# Analyze first to get real errors
-	analysis = _analyze(language, code)
-	errors = [i for i in analysis["issues"] if i.type == "Error"]
+	analysis = _analyze(language, CodeView(code))
+	errors = analysis["errors"]
 	if not errors:
-		# Nothing to fix; return as-is
-		return {"fixed": code, "changes": ["No changes"], "source": "heuristic", "attempts": attempts}
+		return {"errors": errors, "fixed": code, "changes": [], "resolved": True}
 	
 	# Try fast heuristics first (instant results)
 	changes: List[str] = []
@@ -478,40 +818,38 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 	
 	if lang in ("javascript", "typescript"):
 		# Fix var -> let
-		if _var_regex.search(fixed_code):
-			fixed_code = _var_regex.sub("let", fixed_code)
-			changes.append("Replaced var with let")
+		if "var" in fixed_code:
+			fixed_code, replaced = _var_regex.subn("let", fixed_code)
+			if replaced:
+				changes.append("Replaced var with let")
 		
 		# Fix == -> === (but not !=)
-		fixed2 = re.sub(r"(?<![!<>=])==(?!=)", "===", fixed_code)
-		if fixed2 != fixed_code:
-			fixed_code = fixed2
+		fixed_code, replaced = _loose_equality_regex.subn("===", fixed_code)
+		if replaced:
 			changes.append("Replaced == with ===")
 		
 		# Smart bracket balancing
-		pairs = {'(':')', '[':']', '{':'}'}
 		stack: List[str] = []
 		
-		for ch in fixed_code:
-			if ch in pairs:
+		for ch in _non_bracket_regex.sub("", fixed_code):
+			if ch in "([{":
 				stack.append(ch)
-			elif ch in pairs.values():
-				if stack and stack[-1] == {v:k for k,v in pairs.items()}[ch]:
-					stack.pop()
+			elif stack and stack[-1] == _bracket_pairs[ch]:
+				stack.pop()
 		
 		# Add missing closers for remaining openers
 		while stack:
 			opener = stack.pop()
-			fixed_code += pairs[opener]
+			fixed_code += _closing_brackets[opener]
 			changes.append("Added missing closing bracket/paren")
 		
 		# Add missing semicolons
 		lines = fixed_code.split('\n')
 		for i, line in enumerate(lines):
 			line_stripped = line.strip()
-			if line_stripped and not line_stripped.startswith(('//', '/*', '*', 'function', 'if', 'for', 'while', 'switch', 'try', 'catch', 'else')):
-				if not line_stripped.endswith((';', '{', '}', ':', ',', ')')):
-					if any(keyword in line_stripped for keyword in ['const ', 'let ', 'var ', 'return ', 'break', 'continue', 'throw']):
+			if line_stripped and not line_stripped.startswith(_js_non_statement_prefixes):
+				if not line_stripped.endswith(_js_statement_endings):
+					if _js_statement_keyword_regex.search(line_stripped):
 						if not line_stripped.endswith(';'):
 							lines[i] = lines[i].rstrip() + ';'
 							changes.append("Added missing semicolon")
@@ -528,14 +866,14 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 		
 		# Fix common Python syntax issues
 		# Add missing colons after if/for/while/def/class
-		fixed_code = re.sub(r'(\s+)(if|for|while|def|class|elif|else|except|finally|with)\s+([^:\n]+)(\s*)(?!\s*:)', r'\1\2 \3:', fixed_code)
-		if fixed_code != code:
+		fixed_code, replaced = _add_missing_colons(fixed_code)
+		if replaced:
 			changes.append("Added missing colons")
 		
 		# Fix indentation issues (basic)
 		lines = fixed_code.split('\n')
 		for i, line in enumerate(lines):
-			if line.strip() and not line.startswith(' ') and any(keyword in line for keyword in ['def ', 'class ', 'if ', 'for ', 'while ']):
+			if line.strip() and not line.startswith(' ') and _py_definition_keyword_regex.search(line):
 				# This is likely a top-level definition, ensure proper indentation
 				if i > 0 and lines[i-1].strip().endswith(':'):
 					lines[i] = '    ' + line
@@ -544,18 +882,17 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 		
 	elif lang == "java":
 		# Fix == -> .equals() for strings (basic heuristic)
-		fixed2 = re.sub(r'(\w+)\s*==\s*"([^"]*)"', r'\1.equals("\2")', fixed_code)
-		if fixed2 != fixed_code:
-			fixed_code = fixed2
+		fixed_code, replaced = _java_string_equality_regex.subn(r'\1.equals("\2")', fixed_code)
+		if replaced:
 			changes.append("Replaced == with .equals() for strings")
 		
 		# Add missing semicolons
 		lines = fixed_code.split('\n')
 		for i, line in enumerate(lines):
 			line_stripped = line.strip()
-			if line_stripped and not line_stripped.startswith(('//', '/*', '*', 'public', 'private', 'protected', 'class', 'interface', 'enum')):
-				if not line_stripped.endswith((';', '{', '}', ':', ',')):
-					if any(keyword in line_stripped for keyword in ['return ', 'System.out', 'break', 'continue', 'throw']):
+			if line_stripped and not line_stripped.startswith(_java_fix_skip_prefixes):
+				if not line_stripped.endswith(_fix_statement_endings):
+					if _java_fix_keyword_regex.search(line_stripped):
 						if not line_stripped.endswith(';'):
 							lines[i] = lines[i].rstrip() + ';'
 							changes.append("Added missing semicolon")
@@ -566,9 +903,9 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 		lines = fixed_code.split('\n')
 		for i, line in enumerate(lines):
 			line_stripped = line.strip()
-			if line_stripped and not line_stripped.startswith(('#', '//', '/*', '*', 'class', 'struct', 'namespace', 'public:', 'private:', 'protected:')):
-				if not line_stripped.endswith((';', '{', '}', ':', ',')):
-					if any(keyword in line_stripped for keyword in ['return ', 'cout', 'cin', 'break', 'continue', 'throw']):
+			if line_stripped and not line_stripped.startswith(_cpp_fix_skip_prefixes):
+				if not line_stripped.endswith(_fix_statement_endings):
+					if _cpp_fix_keyword_regex.search(line_stripped):
 						if not line_stripped.endswith(';'):
 							lines[i] = lines[i].rstrip() + ';'
 							changes.append("Added missing semicolon")
@@ -587,9 +924,9 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 		lines = fixed_code.split('\n')
 		for i, line in enumerate(lines):
 			line_stripped = line.strip()
-			if line_stripped and not line_stripped.startswith(('#', '//', '/*', '*')):
-				if not line_stripped.endswith((';', '{', '}', ':', ',')):
-					if any(keyword in line_stripped for keyword in ['return ', 'break', 'continue', 'int ', 'char ', 'float ', 'double ']):
+			if line_stripped and not line_stripped.startswith(_c_fix_skip_prefixes):
+				if not line_stripped.endswith(_fix_statement_endings):
+					if _c_fix_keyword_regex.search(line_stripped):
 						if not line_stripped.endswith(';'):
 							lines[i] = lines[i].rstrip() + ';'
 							changes.append("Added missing semicolon")
@@ -610,57 +947,81 @@ def _auto_fix(code: str, language: str) -> Dict[str, Any]:
 	fixed_code = '\n'.join(line.rstrip() for line in fixed_code.split('\n'))
 	
 	# Check if heuristics fixed all errors
+	resolved = False
 	if changes:
-		check_analysis = _analyze(language, fixed_code)
-		remaining_errors = [i for i in check_analysis["issues"] if i.type == "Error"]
-		if not remaining_errors:
-			# Heuristics fixed everything!
-			attempts.append({"source": "heuristic", "applied": True})
-			return {"fixed": fixed_code, "changes": changes, "source": "heuristic", "attempts": attempts}
-	
-	# Try external AI services in parallel when configured
-	import concurrent.futures
+		check_analysis = _analyze(language, CodeView(fixed_code))
+		resolved = not check_analysis["errors"]
+	return {"errors": errors, "fixed": fixed_code, "changes": changes, "resolved": resolved}
+
+
+# Fixes in flight by (sha256 of the code, language): concurrent identical requests
+# (double clicks, several tabs) share one heuristic pass and one round of AI calls
+_inflight_fixes: Dict[Tuple[str, str], "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+async def _auto_fix(code: str, language: str) -> Dict[str, Any]:
+	key = (await run_in_threadpool(lambda: CodeView(code).digest), language)
+	task = _inflight_fixes.get(key)
+	if task is None:
+		task = asyncio.create_task(_run_auto_fix(code, language))
+		_inflight_fixes[key] = task
+		task.add_done_callback(lambda _: _inflight_fixes.pop(key, None))
+	# A disconnecting client must not cancel the fix for the others waiting on it
+	return await asyncio.shield(task)
+
+
+async def _run_auto_fix(code: str, language: str) -> Dict[str, Any]:
+	attempts: List[Dict[str, Any]] = []
+	# Analysis and heuristics are CPU-bound; keep them off the event loop
+	heuristic = await run_in_threadpool(_heuristic_fix, code, language)
+	errors = heuristic["errors"]
+	if not errors:
+		# Nothing to fix; return as-is
+		return {"fixed": code, "changes": ["No changes"], "source": "heuristic", "attempts": attempts}
+	fixed_code = heuristic["fixed"]
+	changes = heuristic["changes"]
+	if heuristic["resolved"]:
+		# Heuristics fixed everything!
+		attempts.append({"source": "heuristic", "applied": True})
+		return {"fixed": fixed_code, "changes": changes, "source": "heuristic", "attempts": attempts}
 	
-	openrouter_key = os.environ.get("OPENROUTER_API_KEY")
-	gemini_key = os.environ.get("GOOGLE_API_KEY")
+	# Try external AI services concurrently when configured
+	tasks: Dict[asyncio.Task, str] = {}
+	if os.environ.get("OPENROUTER_API_KEY"):
+		tasks[asyncio.create_task(_call_openrouter_fix_with_errors(code, language, errors))] = "openrouter"
+	else:
+		attempts.append({"source": "openrouter", "applied": False, "error": "missing_api_key"})
+	if os.environ.get("GOOGLE_API_KEY"):
+		tasks[asyncio.create_task(_call_gemini_fix_with_errors(code, language, errors))] = "google"
+	else:
+		attempts.append({"source": "google", "applied": False, "error": "missing_api_key"})
 	
-	with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-		futures = []
-		source_map: Dict[Any, str] = {}
-		
-		if openrouter_key:
-			f = executor.submit(_call_openrouter_fix_with_errors, code, language, errors)
-			futures.append(f)
-			source_map[f] = "openrouter"
-		else:
-			attempts.append({"source": "openrouter", "applied": False, "error": "missing_api_key"})
-		
-		if gemini_key:
-			f = executor.submit(_call_gemini_fix_with_errors, code, language, errors)
-			futures.append(f)
-			source_map[f] = "google"
-		else:
-			attempts.append({"source": "google", "applied": False, "error": "missing_api_key"})
-		
-		if futures:
-			# Wait for first successful result
-			for f in concurrent.futures.as_completed(futures, timeout=20):
+	# Take the first successful result and cancel the other call
+	loop = asyncio.get_running_loop()
+	deadline = loop.time() + 20
+	pending = set(tasks)
+	try:
+		while pending:
+			done, pending = await asyncio.wait(pending, timeout=max(0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+			if not done:
+				for task in pending:
+					attempts.append({"source": tasks[task], "applied": False, "error": "timeout"})
+				break
+			for task in done:
+				src = tasks[task]
 				try:
-					result = f.result()
-					src = source_map.get(f, "unknown")
-					if result and result != code:
-						# Cancel remaining futures
-						for other in futures:
-							if other is not f and not other.done():
-								other.cancel()
-						attempts.append({"source": src, "applied": True})
-						return {"fixed": result, "changes": ["AI fix applied"], "source": src, "attempts": attempts}
-					else:
-						attempts.append({"source": src, "applied": False, "error": "no_result"})
+					result = task.result()
 				except Exception as e:
 					# Record error for transparency
-					src = source_map.get(f, "unknown")
 					attempts.append({"source": src, "applied": False, "error": str(e)})
+					continue
+				if result and result != code:
+					attempts.append({"source": src, "applied": True})
+					return {"fixed": result, "changes": ["AI fix applied"], "source": src, "attempts": attempts}
+				attempts.append({"source": src, "applied": False, "error": "no_result"})
+	finally:
+		for task in pending:
+			task.cancel()
 
 	# Fallback to heuristic result
 	attempts.append({"source": "heuristic", "applied": bool(changes)})
@@ -672,8 +1033,8 @@ def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
 	code = (req.code or "").rstrip()
 	requested_language = (req.language or "").strip() or "auto"
 	language = _detect_language(code, requested_language)
-	result = _analyze(language, code)
-	analyzed_at = datetime.now(timezone.utc).isoformat()
+	result = _analyze(language, CodeView(code))
+	analyzed_at = _now_iso()
 	return AnalyzeResponse(
 		codeQualityScore=result["score"],
 		issues=result["issues"],
@@ -684,10 +1045,11 @@ def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
 	)
 
 @app.post("/api/fix", response_model=FixResponse)
-def fix(req: FixRequest) -> FixResponse:
+async def fix(req: FixRequest) -> FixResponse:
 	requested_language = (req.language or "").strip() or "auto"
-	language = _detect_language(req.code or "", requested_language)
-	result = _auto_fix(req.code or "", language)
+	# Detection and hashing scale with the submission; keep them off the event loop
+	language = await run_in_threadpool(_detect_language, req.code or "", requested_language)
+	result = await _auto_fix(req.code or "", language)
 	return FixResponse(
 		language=language,
 		fixedCode=result["fixed"],
@@ -696,22 +1058,19 @@ def fix(req: FixRequest) -> FixResponse:
 		attempts=result.get("attempts", []),
 	)
 
-@app.post("/api/report")
-def report(req: ReportRequest) -> dict:
-	language = _detect_language(req.code or "", (req.language or "").strip() or "auto")
-	code = (req.code or "").rstrip()
-	result = _analyze(language, code)
-	analyzed_at = datetime.now(timezone.utc).isoformat()
-	issues: List[Issue] = result["issues"]
-	metrics = result["metrics"]
 
-	errors = [it for it in issues if it.type == "Error"]
-	others = [it for it in issues if it.type != "Error"]
+_TEXT_ISSUE_FMT = "  - Line %d [%s] %s: %s -> Suggestion: %s"
+
+
+def _render_report_body(language: str, view: CodeView) -> str:
+	code = view.text
+	result = _analyze(language, view)
+	errors: List[Issue] = result["errors"]
+	others: List[Issue] = result["others"]
+	metrics = result["metrics"]
 	lines = [
-		"Code Quality Report",
-		f"Timestamp (UTC): {analyzed_at}",
 		f"Language: {language}",
-		f"Code length: {len(code)} chars, {len(code.splitlines())} lines",
+		f"Code length: {len(code)} chars, {view.line_count} lines",
 		"",
 		f"Overall Score: {result['score']}/100",
 		f"Cyclomatic Complexity: {metrics['cyclomaticComplexity']}",
@@ -723,16 +1082,13 @@ def report(req: ReportRequest) -> dict:
 	if not errors:
 		lines.append("  - None 🎉")
 	else:
-		for it in errors:
-			lines.append(f"  - Line {it.line} [{it.severity}] {it.type}: {it.message} -> Suggestion: {it.suggestion}")
+		lines.extend([_TEXT_ISSUE_FMT % (it.line, it.severity, it.type, it.message, it.suggestion) for it in errors])
 
-	lines.append("")
-	lines.append("Warnings & Suggestions:")
+	lines.extend(["", "Warnings & Suggestions:"])
 	if not others:
 		lines.append("  - None")
 	else:
-		for it in others:
-			lines.append(f"  - Line {it.line} [{it.severity}] {it.type}: {it.message} -> Suggestion: {it.suggestion}")
+		lines.extend([_TEXT_ISSUE_FMT % (it.line, it.severity, it.type, it.message, it.suggestion) for it in others])
 
 	lines.extend([
 		"",
@@ -742,83 +1098,126 @@ def report(req: ReportRequest) -> dict:
 		"----------------------------------------",
 	])
 
-	return {"filename": "analysis_report.txt", "content": "\n".join(lines)}
+	return "\n".join(lines)
+
 
-@app.post("/api/report/html")
-def report_html(req: ReportRequest) -> dict:
+@app.post("/api/report", response_class=PlainTextResponse)
+def report(req: ReportRequest) -> PlainTextResponse:
 	language = _detect_language(req.code or "", (req.language or "").strip() or "auto")
 	code = (req.code or "").rstrip()
-	result = _analyze(language, code)
-	analyzed_at = datetime.now(timezone.utc).isoformat()
-	issues: List[Issue] = result["issues"]
-	metrics = result["metrics"]
-
-	errors = [it for it in issues if it.type == "Error"]
-	others = [it for it in issues if it.type != "Error"]
-	def _render_list(items: List[Issue]) -> str:
-		if not items:
-			return "<div>None</div>"
-		return "".join(
-			f'<div class="issue sev-{it.severity}">Line {it.line} [{it.severity}] {it.type}: {it.message} – <em>{it.suggestion}</em></div>' for it in items
-		)
-
-	escaped_code = (
-		code[:2000]
-		.replace("&", "&amp;")
-		.replace("<", "&lt;")
-		.replace(">", "&gt;")
+	analyzed_at = _now_iso()
+	view = CodeView(code)
+	# Everything below the timestamp only depends on (code, language)
+	key = _cache_key(view, language)
+	body = _report_cache.get(key) if key is not None else None
+	if body is None:
+		body = _render_report_body(language, view)
+		if key is not None:
+			_report_cache.put(key, body)
+	return PlainTextResponse(
+		f"Code Quality Report\nTimestamp (UTC): {analyzed_at}\n{body}",
+		headers={"Content-Disposition": 'attachment; filename="analysis_report.txt"'},
 	)
 
-	html = f"""
+# Static parts of the HTML report, built once
+_HTML_HEAD = """
 <!doctype html>
 <html>
 <head>
 <meta charset="utf-8" />
 <title>Code Quality Report</title>
 <style>
- body {{ font-family: Arial, sans-serif; margin: 24px; }}
- h1 {{ margin-bottom: 8px; }}
- .meta {{ color: #555; margin-bottom: 16px; }}
- .section {{ margin-top: 16px; }}
- .code {{ white-space: pre-wrap; background:#0b1021; color:#e3e7ff; padding:12px; border-radius:8px; }}
- .issue {{ margin:6px 0; }}
- .sev-Critical {{ color: #e11d48; }}
- .sev-Major {{ color: #eab308; }}
- .sev-Minor {{ color: #6b7280; }}
+ body { font-family: Arial, sans-serif; margin: 24px; }
+ h1 { margin-bottom: 8px; }
+ .meta { color: #555; margin-bottom: 16px; }
+ .section { margin-top: 16px; }
+ .code { white-space: pre-wrap; background:#0b1021; color:#e3e7ff; padding:12px; border-radius:8px; }
+ .issue { margin:6px 0; }
+ .sev-Critical { color: #e11d48; }
+ .sev-Major { color: #eab308; }
+ .sev-Minor { color: #6b7280; }
 </style>
 </head>
 <body>
 <h1>Code Quality Report</h1>
-<div class="meta">Timestamp (UTC): {analyzed_at} • Language: {language} • Score: {result['score']}/100</div>
+"""
+_HTML_TAIL = """</body>
+</html>
+"""
+# Everything after the timestamp as one %-format template (no other '%' in it), filled in a single C-level pass
+_HTML_REPORT_PREFIX = _HTML_HEAD + '<div class="meta">Timestamp (UTC): '
+_HTML_REPORT_REST_FMT = """ • Language: %(lang)s • Score: %(score)s/100</div>
 <div class="section">
   <strong>Metrics</strong>
-  <div>Cyclomatic Complexity: {metrics['cyclomaticComplexity']}</div>
-  <div>Readability Score: {metrics['readabilityScore']}%</div>
-  <div>Style Adherence: {metrics['styleAdherence']}%</div>
+  <div>Cyclomatic Complexity: %(cc)s</div>
+  <div>Readability Score: %(rs)s%%</div>
+  <div>Style Adherence: %(sa)s%%</div>
 </div>
 <div class="section">
   <strong>Errors</strong>
-  {_render_list(errors)}
+  %(errs)s
 </div>
 <div class="section">
   <strong>Warnings & Suggestions</strong>
-  {_render_list(others)}
+  %(others)s
 </div>
 <div class="section">
   <strong>Code Snippet</strong>
-  <div class="code">{escaped_code}</div>
+  <div class="code">%(code)s</div>
 </div>
-</body>
-</html>
-"""
-	return {"filename": "analysis_report.html", "html": html}
+""" + _HTML_TAIL
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ISSUE_FMT = '<div class="issue sev-%s">Line %d [%s] %s: %s – <em>%s</em></div>'
+
+
+def _render_issue_list_html(items: List[Issue]) -> str:
+	if not items:
+		return "<div>None</div>"
+	return "".join([_ISSUE_FMT % (it.severity, it.line, it.severity, it.type, it.message, it.suggestion) for it in items])
+
+
+def _render_report_html_rest(language: str, view: CodeView) -> str:
+	result = _analyze(language, view)
+	metrics = result["metrics"]
+	snippet = view.text[:2000]
+	# Most snippets have nothing to escape; the membership tests are cheaper than a translate copy
+	if "&" in snippet or "<" in snippet or ">" in snippet:
+		snippet = snippet.translate(_HTML_ESCAPE_TABLE)
+	return _HTML_REPORT_REST_FMT % {
+		"lang": language,
+		"score": result["score"],
+		"cc": metrics["cyclomaticComplexity"],
+		"rs": metrics["readabilityScore"],
+		"sa": metrics["styleAdherence"],
+		"errs": _render_issue_list_html(result["errors"]),
+		"others": _render_issue_list_html(result["others"]),
+		"code": snippet,
+	}
+
+
+@app.post("/api/report/html", response_class=HTMLResponse)
+def report_html(req: ReportRequest) -> HTMLResponse:
+	language = _detect_language(req.code or "", (req.language or "").strip() or "auto")
+	code = (req.code or "").rstrip()
+	analyzed_at = _now_iso()
+	view = CodeView(code)
+	# As in report(): the rendered page after the timestamp only depends on (code, language)
+	key = _cache_key(view, language)
+	rest = _html_report_cache.get(key) if key is not None else None
+	if rest is None:
+		rest = _render_report_html_rest(language, view)
+		if key is not None:
+			_html_report_cache.put(key, rest)
+	html = _HTML_REPORT_PREFIX + analyzed_at + rest
+	return HTMLResponse(html, headers={"Content-Disposition": 'attachment; filename="analysis_report.html"'})
 
 if __name__ == "__main__":
-	# Allow running with: python main.py
+	# Allow running with: python main.py (DEV_RELOAD=1 to watch files, WEB_CONCURRENCY=N for workers)
 	import uvicorn
 	uvicorn.run(
 		"main:app",
 		host="127.0.0.1",
 		port=8000,
-		reload=True,
+		reload=os.getenv("DEV_RELOAD") == "1",
+		workers=int(os.getenv("WEB_CONCURRENCY", "1")),
 	)
@@ -45,6 +45,10 @@ type AnalyzeResponse = {
 
 type HistoryItem = AnalyzeResponse & { id: string };
 
+// Report endpoints return the file body directly and name it in Content-Disposition
+const reportFilename = (res: Response, fallback: string) =>
+  res.headers.get("Content-Disposition")?.match(/filename="([^"]+)"/)?.[1] ?? fallback;
+
 const Index = () => {
   const [code, setCode] = useState(defaultCode);
   const [language, setLanguage] = useState("auto");
@@ -215,7 +219,8 @@ const Index = () => {
       if (!res.ok) {
         throw new Error(`Report failed: ${res.status}`);
       }
-      const { filename, content } = (await res.json()) as { filename: string; content: string };
+      const filename = reportFilename(res, "analysis_report.txt");
+      const content = await res.text();
       const blob = new Blob([content], { type: "text/plain;charset=utf-8" });
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");
@@ -242,7 +247,8 @@ const Index = () => {
       if (!res.ok) {
         throw new Error(`Report failed: ${res.status}`);
       }
-      const { filename, html } = (await res.json()) as { filename: string; html: string };
+      const filename = reportFilename(res, "analysis_report.html");
+      const html = await res.text();
       const blob = new Blob([html], { type: "text/html;charset=utf-8" });
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");